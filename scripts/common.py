@@ -0,0 +1,37 @@
+r"""
+Shared QGIS bootstrap for the standalone scripts.
+
+Booting QGIS loads every provider (GDAL, OGR, WMS, ...) and costs seconds
+of wall time, so the application is created once per process and reused.
+"""
+
+from qgis.core import QgsApplication
+
+# Module-level singleton; created on first init_qgis() call
+_QGS = None
+
+
+def init_qgis():
+    """Initialize QGIS application for standalone usage.
+
+    Returns the existing application when called more than once in the same
+    process, so chained scripts don't pay the provider-loading cost twice.
+    """
+    global _QGS
+    if _QGS is None:
+        QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
+        _QGS = QgsApplication([], False)
+        _QGS.initQgis()
+    return _QGS
+
+
+def exit_qgis():
+    """Tear down the application created by init_qgis, if there is one.
+
+    Clears the singleton as well, so a later init_qgis() call builds a
+    fresh application instead of handing back the torn-down one.
+    """
+    global _QGS
+    if _QGS is not None:
+        _QGS.exitQgis()
+        _QGS = None
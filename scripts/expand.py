@@ -13,11 +13,12 @@ import sys
 from pathlib import Path
 
 from qgis.core import (
-    QgsApplication,
     QgsProject,
     QgsLayerTreeLayer,
 )
 
+from common import exit_qgis, init_qgis
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
@@ -27,14 +28,6 @@ PROJECT_FILE = PROJECT_DIR / "wfma.qgs"
 DEPTH_GROUP = "Depth"
 
 
-def init_qgis():
-    """Initialize QGIS application for standalone usage."""
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
-    return qgs
-
-
 def load_project():
     """Load the QGIS project."""
     project = QgsProject.instance()
@@ -44,18 +37,26 @@ def load_project():
     return project
 
 
-def set_expanded_recursive(node, expanded):
-    """Recursively set expanded state for all groups."""
-    group_count = 0
+def set_expanded_all(node, expanded):
+    """Set expanded state for all groups using an explicit stack (no recursion).
 
-    for child in node.children():
-        if not isinstance(child, QgsLayerTreeLayer):
-            # It's a group
-            child.setExpanded(expanded)
-            group_count += 1
-            group_count += set_expanded_recursive(child, expanded)
+    Only touches groups that are not already in the target state and returns
+    the number of groups actually changed.
+    """
+    changed_count = 0
 
-    return group_count
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for child in current.children():
+            if not isinstance(child, QgsLayerTreeLayer):
+                # It's a group
+                if child.isExpanded() != expanded:
+                    child.setExpanded(expanded)
+                    changed_count += 1
+                stack.append(child)
+
+    return changed_count
 
 
 def main():
@@ -80,7 +81,7 @@ def main():
         print(f"Expanding all groups under '{DEPTH_GROUP}'...")
         expand = True
 
-    qgs = init_qgis()
+    init_qgis()
     try:
         project = load_project()
         if not project:
@@ -95,14 +96,22 @@ def main():
             return False
 
         # Set Depth group expanded state
-        depth_group.setExpanded(expand)
+        group_count = 0
+        if depth_group.isExpanded() != expand:
+            depth_group.setExpanded(expand)
+            group_count += 1
 
         # Set all child groups expanded state
-        group_count = set_expanded_recursive(depth_group, expand)
+        group_count += set_expanded_all(depth_group, expand)
 
         action = "Expanded" if expand else "Collapsed"
         print(f"{action} {group_count} group(s).")
 
+        # Skip the expensive project re-write when nothing changed
+        if group_count == 0:
+            print("\nNo changes; project not saved.")
+            return True
+
         if project.write():
             print("\nProject saved.")
             return True
@@ -110,7 +119,7 @@ def main():
             print("ERROR: Failed to save project.")
             return False
     finally:
-        qgs.exitQgis()
+        exit_qgis()
 
 
 if __name__ == "__main__":
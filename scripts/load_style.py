@@ -11,10 +11,12 @@ import sys
 from pathlib import Path
 
 from qgis.core import (
-    QgsApplication,
     QgsProject,
     QgsLayerTreeLayer,
 )
+from qgis.PyQt.QtXml import QDomDocument
+
+from common import exit_qgis, init_qgis
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -26,28 +28,28 @@ DEPTH_STYLE = r"C:\Users\m.rahman\qgis\wfma\scripts\qmls\depth.qml"
 DEPTH_GROUP = "Depth"
 
 
-def init_qgis():
-    """Initialize QGIS application for standalone usage."""
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
-    return qgs
+def load_style_document(style_path):
+    """Read and parse the QML style file once into a QDomDocument."""
+    doc = QDomDocument()
+    with open(style_path, encoding='utf-8') as f:
+        doc.setContent(f.read())
+    return doc
 
 
-def apply_style_recursive(node, style_path):
-    """Recursively apply style to all layers under a node."""
+def apply_style_recursive(node, style_doc):
+    """Recursively apply a pre-parsed style document to all layers under a node."""
     count = 0
     for child in node.children():
         if isinstance(child, QgsLayerTreeLayer):
             layer = child.layer()
             if layer:
-                layer.loadNamedStyle(style_path)
+                layer.importNamedStyle(style_doc)
                 layer.triggerRepaint()
                 print(f"  Styled: {layer.name()}")
                 count += 1
         else:
             # It's a group - recurse
-            count += apply_style_recursive(child, style_path)
+            count += apply_style_recursive(child, style_doc)
     return count
 
 
@@ -61,7 +63,7 @@ def main():
         print(f"ERROR: Style file not found: {DEPTH_STYLE}")
         return False
 
-    qgs = init_qgis()
+    init_qgis()
 
     try:
         project = QgsProject.instance()
@@ -81,7 +83,8 @@ def main():
             return False
 
         print(f"\nApplying style to layers under '{DEPTH_GROUP}'...")
-        count = apply_style_recursive(depth_group, DEPTH_STYLE)
+        style_doc = load_style_document(DEPTH_STYLE)
+        count = apply_style_recursive(depth_group, style_doc)
 
         print(f"\nStyled {count} layer(s).")
 
@@ -100,7 +103,7 @@ def main():
         return True
 
     finally:
-        qgs.exitQgis()
+        exit_qgis()
 
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ Phase 2 (plain Python, no QGIS):
     Reads purge.txt and deletes the files/folders
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -26,15 +27,26 @@ PURGE_FILE = SCRIPT_DIR / "purge.txt"
 DEPTH_GROUP = "Depth"
 
 
+def stat_key(path):
+    """Identity key for a path: (device, inode).
+
+    Robust to case differences and short/long path variants that defeat
+    string comparison, and cheaper to hash than long path strings.
+    """
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino)
+
+
 def do_list():
     """Phase 1: Analyze project and write paths to purge.txt"""
     # Import QGIS only for this phase
     from qgis.core import (
-        QgsApplication,
         QgsProject,
         QgsLayerTreeLayer,
     )
 
+    from common import exit_qgis, init_qgis
+
     def get_layer_sources(node):
         sources = []
         for child in node.children():
@@ -52,9 +64,7 @@ def do_list():
     print("=" * 60)
 
     # Initialize QGIS
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
+    init_qgis()
 
     try:
         project = QgsProject.instance()
@@ -79,17 +89,19 @@ def do_list():
             print("No layers found. Nothing to keep.")
             return True
 
-        # Normalize paths
+        # Key required paths by (device, inode) rather than path strings
         required_tifs = set()
         required_folders = set()
 
         for src in layer_sources:
             try:
-                src_resolved = src.resolve()
-                required_tifs.add(str(src_resolved))
-                required_folders.add(str(src_resolved.parent))
-            except Exception as e:
-                print(f"  Warning: Could not resolve path {src}: {e}")
+                required_tifs.add(stat_key(src))
+            except OSError as e:
+                print(f"  Warning: Could not stat path {src}: {e}")
+            try:
+                required_folders.add(stat_key(src.parent))
+            except OSError:
+                pass
 
         print(f"Required TIF files: {len(required_tifs)}")
         print(f"Required folders: {len(required_folders)}")
@@ -102,20 +114,19 @@ def do_list():
         files_to_delete = []
         folders_to_delete = []
 
-        for area_folder in DEPTH_DIR.iterdir():
-            if not area_folder.is_dir():
-                files_to_delete.append(str(area_folder.resolve()))
-                continue
-
-            area_resolved = str(area_folder.resolve())
+        with os.scandir(DEPTH_DIR) as it:
+            for area_entry in it:
+                if not area_entry.is_dir(follow_symlinks=False):
+                    files_to_delete.append(area_entry.path)
+                    continue
 
-            if area_resolved not in required_folders:
-                folders_to_delete.append(area_resolved)
-            else:
-                for f in area_folder.iterdir():
-                    f_resolved = str(f.resolve())
-                    if f.is_file() and f_resolved not in required_tifs:
-                        files_to_delete.append(f_resolved)
+                if stat_key(area_entry.path) not in required_folders:
+                    folders_to_delete.append(area_entry.path)
+                else:
+                    with os.scandir(area_entry.path) as files_it:
+                        for f in files_it:
+                            if f.is_file(follow_symlinks=False) and stat_key(f.path) not in required_tifs:
+                                files_to_delete.append(f.path)
 
         # Report
         print(f"\n" + "-" * 60)
@@ -139,12 +150,12 @@ def do_list():
             PURGE_FILE.write_text("")
             return True
 
-        # Write to purge.txt
-        with open(PURGE_FILE, 'w', encoding='utf-8') as f:
-            for path in files_to_delete:
-                f.write(f"FILE:{path}\n")
-            for path in folders_to_delete:
-                f.write(f"FOLDER:{path}\n")
+        # Write to purge.txt in one go
+        buf = (
+            "".join(f"FILE:{path}\n" for path in files_to_delete)
+            + "".join(f"FOLDER:{path}\n" for path in folders_to_delete)
+        )
+        PURGE_FILE.write_text(buf, encoding='utf-8')
 
         print(f"\n" + "=" * 60)
         print(f"Written {total} path(s) to: {PURGE_FILE}")
@@ -155,14 +166,15 @@ def do_list():
         return True
 
     finally:
-        project.removeAllMapLayers()
-        project.clear()
-        qgs.exitQgis()
+        # do_list is read-only; exit_qgis() tears the project down, so no need
+        # to pay for removeAllMapLayers()/clear() on large projects first
+        exit_qgis()
 
 
 def do_confirm():
     """Phase 2: Read purge.txt and delete (NO QGIS)"""
     import shutil
+    from concurrent.futures import ThreadPoolExecutor
 
     print("=" * 60)
     print("Purge - Phase 2: Delete")
@@ -178,37 +190,50 @@ def do_confirm():
         print("\nNothing to delete (purge.txt is empty).")
         return True
 
-    lines = content.split('\n')
+    lines = [line.strip() for line in content.split('\n') if line.strip()]
     print(f"\nFound {len(lines)} path(s) to delete.\n")
 
+    file_paths = [Path(line[5:]) for line in lines if line.startswith("FILE:")]
+    folder_paths = [Path(line[7:]) for line in lines if line.startswith("FOLDER:")]
+
+    def delete_file(path):
+        try:
+            path.unlink()
+            return path, None
+        except Exception as e:
+            return path, e
+
+    def delete_folder(path):
+        try:
+            shutil.rmtree(path)
+            return path, None
+        except Exception as e:
+            return path, e
+
+    # Deletion releases the GIL, so threads overlap the per-path syscall waits
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        file_results = list(executor.map(delete_file, file_paths))
+        folder_results = list(executor.map(delete_folder, folder_paths))
+
     deleted_files = 0
     deleted_folders = 0
     errors = 0
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        if line.startswith("FILE:"):
-            path = Path(line[5:])
-            try:
-                path.unlink()
-                print(f"  Deleted file: {path.name}")
-                deleted_files += 1
-            except Exception as e:
-                print(f"  ERROR deleting file {path}: {e}")
-                errors += 1
-
-        elif line.startswith("FOLDER:"):
-            path = Path(line[7:])
-            try:
-                shutil.rmtree(path)
-                print(f"  Deleted folder: {path.name}")
-                deleted_folders += 1
-            except Exception as e:
-                print(f"  ERROR deleting folder {path}: {e}")
-                errors += 1
+    for path, error in file_results:
+        if error is None:
+            print(f"  Deleted file: {path.name}")
+            deleted_files += 1
+        else:
+            print(f"  ERROR deleting file {path}: {error}")
+            errors += 1
+
+    for path, error in folder_results:
+        if error is None:
+            print(f"  Deleted folder: {path.name}")
+            deleted_folders += 1
+        else:
+            print(f"  ERROR deleting folder {path}: {error}")
+            errors += 1
 
     # Clear purge.txt after successful deletion
     if errors == 0:
@@ -11,11 +11,12 @@ import sys
 from pathlib import Path
 
 from qgis.core import (
-    QgsApplication,
     QgsProject,
     QgsLayerTreeLayer,
 )
 
+from common import exit_qgis, init_qgis
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
@@ -25,14 +26,6 @@ PROJECT_FILE = PROJECT_DIR / "wfma.qgs"
 DEPTH_GROUP = "Depth"
 
 
-def init_qgis():
-    """Initialize QGIS application for standalone usage."""
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
-    return qgs
-
-
 def count_children(group):
     """Count layers and groups recursively."""
     layer_count = 0
@@ -53,7 +46,7 @@ def main():
     print(f"Remove Layers Under '{DEPTH_GROUP}'")
     print("=" * 60)
 
-    qgs = init_qgis()
+    init_qgis()
 
     try:
         project = QgsProject.instance()
@@ -110,7 +103,7 @@ def main():
         return True
 
     finally:
-        qgs.exitQgis()
+        exit_qgis()
 
 
 if __name__ == "__main__":
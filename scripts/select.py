@@ -24,15 +24,16 @@ Examples:
 import argparse
 import re
 import sys
+from collections import deque
 from pathlib import Path
 
 from qgis.core import (
-    QgsApplication,
     QgsProject,
     QgsLayerTreeLayer,
-    QgsLayerTreeGroup,
 )
 
+from common import exit_qgis, init_qgis
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_DIR = SCRIPT_DIR.parent
@@ -42,14 +43,6 @@ PROJECT_FILE = PROJECT_DIR / "wfma.qgs"
 DEPTH_GROUP = "Depth"
 
 
-def init_qgis():
-    """Initialize QGIS application for standalone usage."""
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
-    return qgs
-
-
 def load_project():
     """Load the QGIS project."""
     project = QgsProject.instance()
@@ -59,107 +52,118 @@ def load_project():
     return project
 
 
-def deselect_all(node):
-    """Recursively deselect (uncheck) all layers and groups."""
+def set_all_checked(node, checked):
+    """Set checked state on all layers and groups using an iterative walk.
+
+    Nodes already in the target state are left untouched; the third return
+    value is the number of nodes actually changed.
+    """
     layer_count = 0
     group_count = 0
-
-    for child in node.children():
+    changed = 0
+
+    queue = deque(node.children())
+    while queue:
+        child = queue.popleft()
+        if child.itemVisibilityChecked() != checked:
+            child.setItemVisibilityChecked(checked)
+            changed += 1
         if isinstance(child, QgsLayerTreeLayer):
-            child.setItemVisibilityChecked(False)
             layer_count += 1
         else:
-            child.setItemVisibilityChecked(False)
             group_count += 1
-            sub_layers, sub_groups = deselect_all(child)
-            layer_count += sub_layers
-            group_count += sub_groups
-
-    return layer_count, group_count
+            queue.extend(child.children())
 
+    return layer_count, group_count, changed
 
-def select_all(node):
-    """Recursively select (check) all layers and groups."""
-    layer_count = 0
-    group_count = 0
 
-    for child in node.children():
-        if isinstance(child, QgsLayerTreeLayer):
-            child.setItemVisibilityChecked(True)
-            layer_count += 1
-        else:
-            child.setItemVisibilityChecked(True)
-            group_count += 1
-            sub_layers, sub_groups = select_all(child)
-            layer_count += sub_layers
-            group_count += sub_groups
-
-    return layer_count, group_count
+def deselect_all(node):
+    """Deselect (uncheck) all layers and groups."""
+    return set_all_checked(node, False)
 
 
-def get_ancestor_groups(node):
-    """Get all ancestor groups from a node up to (but not including) the root."""
-    ancestors = []
-    parent = node.parent()
-    while parent is not None:
-        if isinstance(parent, QgsLayerTreeGroup) and parent.parent() is not None:
-            ancestors.append(parent)
-        parent = parent.parent()
-    return ancestors
+def select_all(node):
+    """Select (check) all layers and groups."""
+    return set_all_checked(node, True)
 
 
-def get_parent_group_names(node):
-    """Get names of all ancestor groups for a node."""
-    return [g.name() for g in get_ancestor_groups(node)]
+# Splits layer names into digit runs; compiled once rather than building a
+# per-year lookaround pattern on every call
+_NONDIGIT = re.compile(r'\D+')
 
 
 def matches_year(layer_name, year):
     """Check if layer name contains the year number (not as part of a larger number)."""
-    pattern = rf'(?<!\d){year}(?!\d)'
-    return bool(re.search(pattern, layer_name))
+    target = str(year)
+    return any(token == target for token in _NONDIGIT.split(layer_name))
+
+
+def build_index(depth_group):
+    """Walk the tree under a group once and flatten its layers for filtering.
+
+    Returns a list of (layer_node, layer_name_lower, ancestors,
+    ancestor_names_lower) entries, so the filter passes run over plain
+    Python strings instead of re-traversing the Qt layer tree. The ancestor
+    chain is threaded through the walk, so no parent pointers are chased.
+    """
+    index = []
+
+    stack = [(depth_group, (depth_group,), (depth_group.name().lower(),))]
+    while stack:
+        node, ancestors, ancestor_names_lower = stack.pop()
+        for child in node.children():
+            if isinstance(child, QgsLayerTreeLayer):
+                layer = child.layer()
+                if not layer:
+                    continue
+                index.append((
+                    child,
+                    layer.name().lower(),
+                    ancestors,
+                    ancestor_names_lower,
+                ))
+            else:
+                stack.append((
+                    child,
+                    ancestors + (child,),
+                    ancestor_names_lower + (child.name().lower(),),
+                ))
+
+    return index
 
 
-def matches_filters(layer_node, args):
-    """Check if a layer matches all specified filters."""
-    layer = layer_node.layer()
-    if not layer:
-        return False
+def matches_filters(layer_name_lower, ancestor_names_lower, args):
+    """Check if an indexed layer matches all specified filters.
 
-    layer_name = layer.name()
-    parent_group_names = get_parent_group_names(layer_node)
+    Cheapest filters first: both name checks look at the layer name alone,
+    so the ancestor scan only runs for layers that already passed them.
+    """
+    if args.area_lower:
+        if args.area_lower not in layer_name_lower:
+            return False
 
-    if args.area:
-        if args.area.lower() not in layer_name.lower():
+    if args.year is not None:
+        if not matches_year(layer_name_lower, args.year):
             return False
 
-    if args.group:
+    if args.group_lower:
         group_match = any(
-            args.group.lower() in group_name.lower()
-            for group_name in parent_group_names
+            args.group_lower in group_name
+            for group_name in ancestor_names_lower
         )
         if not group_match:
             return False
 
-    if args.year is not None:
-        if not matches_year(layer_name, args.year):
-            return False
-
     return True
 
 
-def find_matching_layers(node, args):
-    """Recursively find all layers matching the filters."""
-    matches = []
-
-    for child in node.children():
-        if isinstance(child, QgsLayerTreeLayer):
-            if matches_filters(child, args):
-                ancestors = get_ancestor_groups(child)
-                matches.append((child, ancestors))
-        else:
-            matches.extend(find_matching_layers(child, args))
-
-    return matches
+def find_matching_layers(index, args):
+    """Find all indexed layers matching the filters."""
+    return [
+        (layer_node, ancestors)
+        for layer_node, name_lower, ancestors, ancestor_names_lower in index
+        if matches_filters(name_lower, ancestor_names_lower, args)
+    ]
 
 
 def main():
@@ -190,6 +194,10 @@ def main():
 
     args = parser.parse_args()
 
+    # Lowercase the filter terms once; matches_filters runs per layer
+    args.area_lower = args.area.lower() if args.area else None
+    args.group_lower = args.group.lower() if args.group else None
+
     # Check for -none flag
     if args.none:
         print(f"Deselecting all layers under '{DEPTH_GROUP}'...")
@@ -208,7 +216,7 @@ def main():
         print(f"Selecting all layers under '{DEPTH_GROUP}'...")
         mode = "all"
 
-    qgs = init_qgis()
+    init_qgis()
     try:
         project = load_project()
         if not project:
@@ -222,47 +230,76 @@ def main():
             print(f"ERROR: Group '{DEPTH_GROUP}' not found.")
             return False
 
-        if mode == "none":
-            # Deselect Depth group and all its children
-            depth_group.setItemVisibilityChecked(False)
-            layer_count, group_count = deselect_all(depth_group)
-            print(f"Deselected {layer_count} layer(s) and {group_count} group(s).")
+        # Suppress per-node visibility signals while mutating in bulk; the
+        # layer tree model otherwise reacts to every setItemVisibilityChecked
+        root.blockSignals(True)
+        changes = 0
+        try:
+            if mode == "none":
+                # Deselect Depth group and all its children
+                if depth_group.itemVisibilityChecked():
+                    depth_group.setItemVisibilityChecked(False)
+                    changes += 1
+                layer_count, group_count, changed = deselect_all(depth_group)
+                changes += changed
+                print(f"Deselected {layer_count} layer(s) and {group_count} group(s).")
+
+            elif mode == "all":
+                # Select Depth group and all its children
+                if not depth_group.itemVisibilityChecked():
+                    depth_group.setItemVisibilityChecked(True)
+                    changes += 1
+                layer_count, group_count, changed = select_all(depth_group)
+                changes += changed
+                print(f"Selected {layer_count} layer(s) and {group_count} group(s).")
 
-        elif mode == "all":
-            # Select Depth group and all its children
-            depth_group.setItemVisibilityChecked(True)
-            layer_count, group_count = select_all(depth_group)
-            print(f"Selected {layer_count} layer(s) and {group_count} group(s).")
-
-        else:
-            # Filter mode - first deselect all under Depth
-            depth_group.setItemVisibilityChecked(False)
-            deselect_all(depth_group)
-
-            matches = find_matching_layers(depth_group, args)
-
-            if not matches:
-                print("No layers matched the filters.")
             else:
-                groups_to_select = set()
-                layers_selected = 0
-
+                # Filter mode - work out the target state first, then make a
+                # single pass that only flips nodes whose state differs,
+                # instead of deselecting everything and re-selecting matches
+                matches = find_matching_layers(build_index(depth_group), args)
+
+                # Keyed by id() so deduping hashes plain ints rather than
+                # Qt object wrappers
+                groups_to_select = {}
                 for layer_node, ancestors in matches:
-                    layer_node.setItemVisibilityChecked(True)
-                    layers_selected += 1
                     for group in ancestors:
-                        groups_to_select.add(group)
-
-                for group in groups_to_select:
-                    group.setItemVisibilityChecked(True)
-
-                print(f"Selected {layers_selected} layer(s) and {len(groups_to_select)} group(s).")
-
-                print("\nMatched layers:")
-                for layer_node, _ in matches:
-                    layer = layer_node.layer()
-                    if layer:
-                        print(f"  - {layer.name()}")
+                        groups_to_select.setdefault(id(group), group)
+
+                keep = {id(layer_node) for layer_node, _ in matches}
+                keep.update(groups_to_select)
+
+                queue = deque([depth_group])
+                while queue:
+                    node = queue.popleft()
+                    wanted = id(node) in keep
+                    if node.itemVisibilityChecked() != wanted:
+                        node.setItemVisibilityChecked(wanted)
+                        changes += 1
+                    if not isinstance(node, QgsLayerTreeLayer):
+                        queue.extend(node.children())
+
+                if not matches:
+                    print("No layers matched the filters.")
+                else:
+                    # Emit the summary in one write rather than a print per layer
+                    lines = [
+                        f"Selected {len(matches)} layer(s) and {len(groups_to_select)} group(s).",
+                        "",
+                        "Matched layers:",
+                    ]
+                    for layer_node, _ in matches:
+                        layer = layer_node.layer()
+                        if layer:
+                            lines.append(f"  - {layer.name()}")
+                    sys.stdout.write("\n".join(lines) + "\n")
+        finally:
+            root.blockSignals(False)
+
+        # Nothing changed - skip the expensive project re-write
+        if changes == 0:
+            print("\nNo changes; project not saved.")
+            return True
 
         if project.write():
             print("\nProject saved.")
@@ -271,7 +308,7 @@ def main():
             print("ERROR: Failed to save project.")
             return False
     finally:
-        qgs.exitQgis()
+        exit_qgis()
 
 
 if __name__ == "__main__":
@@ -11,15 +11,21 @@ Usage:
     python-qgis setup.py
 """
 
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from qgis.core import (
-    QgsApplication,
     QgsCoordinateReferenceSystem,
+    QgsLayerTreeGroup,
+    QgsLayerTreeLayer,
     QgsProject,
     QgsRasterLayer,
 )
+from qgis.PyQt.QtXml import QDomDocument
+
+from common import exit_qgis, init_qgis
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -29,20 +35,9 @@ DEPTH_DIR = PROJECT_DIR / "data" / "depth"
 DEPTH_STYLE = r"C:\Users\m.rahman\qgis\wfma\scripts\qmls\depth.qml"
 
 
-def init_qgis():
-    """Initialize QGIS application for standalone usage."""
-    QgsApplication.setPrefixPath("C:/Program Files/QGIS 3.44.3", True)
-    qgs = QgsApplication([], False)
-    qgs.initQgis()
-    return qgs
-
-
-def layer_exists_in_group(group, layer_name):
-    """Check if a layer with the given name already exists in the group."""
-    for child in group.children():
-        if hasattr(child, 'name') and child.name() == layer_name:
-            return True
-    return False
+def group_layer_names(group):
+    """Collect the names of a group's children in one traversal."""
+    return {child.name() for child in group.children() if hasattr(child, 'name')}
 
 
 def setup_depths():
@@ -53,7 +48,7 @@ def setup_depths():
 
     # Initialize QGIS
     print("\nInitializing QGIS...")
-    qgs = init_qgis()
+    init_qgis()
 
     # CRS must be created AFTER QGIS is initialized
     target_crs = QgsCoordinateReferenceSystem("EPSG:7854")
@@ -70,13 +65,18 @@ def setup_depths():
 
         # Check depth directory
         print(f"\nDepth directory: {DEPTH_DIR}")
-        if not DEPTH_DIR.exists():
+        if not os.path.isdir(DEPTH_DIR):
             print("ERROR: Depth directory not found!")
             return False
 
-        # Check style file
+        # Check style file and parse it once; every layer imports the same document
         print(f"Style file: {DEPTH_STYLE}")
-        if not Path(DEPTH_STYLE).exists():
+        style_doc = None
+        if os.path.isfile(DEPTH_STYLE):
+            style_doc = QDomDocument()
+            with open(DEPTH_STYLE, encoding='utf-8') as f:
+                style_doc.setContent(f.read())
+        else:
             print("WARNING: Style file not found, layers will use default style.")
 
         # Get layer tree root
@@ -90,11 +90,20 @@ def setup_depths():
         else:
             print("Using existing parent group: Depth")
 
-        # Find subfolders
-        subfolders = sorted(
-            [d for d in DEPTH_DIR.iterdir() if d.is_dir()],
-            key=lambda x: x.name.lower()
-        )
+        # Index the existing subgroups once; findGroup() walks the children
+        # on every call, which is quadratic over many subfolders
+        group_index = {
+            child.name(): child
+            for child in depth_group.children()
+            if isinstance(child, QgsLayerTreeGroup)
+        }
+
+        # Find subfolders, ordered case-insensitively
+        with os.scandir(DEPTH_DIR) as it:
+            subfolders = sorted(
+                [e for e in it if e.is_dir()],
+                key=lambda e: e.name.casefold()
+            )
         print(f"Found {len(subfolders)} subfolders")
 
         if not subfolders:
@@ -106,61 +115,129 @@ def setup_depths():
         total_skipped = 0
         total_failed = 0
 
-        # Process each subfolder
-        for folder in subfolders:
-            folder_name = folder.name
-            print(f"\n  Processing: {folder_name}")
-
-            # Find or create group under Depth
-            group = depth_group.findGroup(folder_name)
-            if group is None:
-                group = depth_group.addGroup(folder_name)
-                print(f"    Created group: {folder_name}")
-            else:
-                print(f"    Using existing group: {folder_name}")
-
-            # Find TIFFs
-            tif_files = sorted(
-                [f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in (".tif", ".tiff")],
-                key=lambda x: x.name.lower()
-            )
-            print(f"    Found {len(tif_files)} TIFFs")
-
-            # Process each TIFF
-            for tif_path in tif_files:
-                tif_name = tif_path.stem
-
-                # Skip if already exists
-                if layer_exists_in_group(group, tif_name):
-                    print(f"      Skipped (exists): {tif_name}")
-                    total_skipped += 1
-                    continue
-
-                # Load raster
-                layer = QgsRasterLayer(str(tif_path), tif_name)
-
-                if not layer.isValid():
-                    print(f"      FAILED: {tif_name}")
-                    total_failed += 1
-                    continue
-
-                # Set CRS
+        def load_raster(entry, name):
+            """Open, validate and style one raster; runs off the main thread.
+
+            QgsRasterLayer construction and style loading are GDAL/file I/O
+            that release the GIL, so these overlap across workers. Project
+            and layer-tree mutations stay on the main thread.
+            """
+            layer = QgsRasterLayer(entry.path, name)
+            if not layer.isValid():
+                return name, None
+            # Only override the CRS when the file doesn't already carry it;
+            # setCrs invalidates extents and triggers a reprojection setup
+            if layer.crs().authid() != "EPSG:7854":
                 layer.setCrs(target_crs)
-
-                # Apply style
-                layer.loadNamedStyle(DEPTH_STYLE)
-
-                # Add to project and group
-                project.addMapLayer(layer, False)
-                group.addLayer(layer)
-
-                print(f"      Added: {tif_name}")
-                total_added += 1
-
-        # Save project
+            # A sidecar .qml beside the TIFF was already picked up by QGIS
+            # during construction; don't overwrite it with the global style
+            if style_doc is not None and not os.path.isfile(
+                os.path.splitext(entry.path)[0] + ".qml"
+            ):
+                layer.importNamedStyle(style_doc)
+            return name, layer
+
+        # Suppress per-add layer-tree and project signals during bulk insert
+        root.blockSignals(True)
+        project.blockSignals(True)
+
+        try:
+            # Process each subfolder
+            for folder in subfolders:
+                folder_name = folder.name
+                print(f"\n  Processing: {folder_name}")
+
+                # Find or create group under Depth
+                group = group_index.get(folder_name)
+                if group is None:
+                    group = depth_group.addGroup(folder_name)
+                    group_index[folder_name] = group
+                    print(f"    Created group: {folder_name}")
+                else:
+                    print(f"    Using existing group: {folder_name}")
+
+                # Existing child names, so duplicate checks are O(1) lookups
+                existing_names = group_layer_names(group)
+
+                # Find TIFFs, ordered the same way as the subfolders; the
+                # casefolded name doubles as extension check and sort key
+                keyed = []
+                with os.scandir(folder.path) as it:
+                    for e in it:
+                        if not e.is_file():
+                            continue
+                        name = e.name.casefold()
+                        if name.endswith((".tif", ".tiff")):
+                            keyed.append((name, e))
+                keyed.sort(key=lambda kv: kv[0])
+                tif_files = [e for _, e in keyed]
+                print(f"    Found {len(tif_files)} TIFFs")
+
+                # Per-file messages are buffered and emitted once per subfolder,
+                # so console flushing doesn't interleave with the load work
+                messages = []
+
+                # Work out which TIFFs are new
+                pending = []
+                for tif_entry in tif_files:
+                    tif_name = os.path.splitext(tif_entry.name)[0]
+
+                    # Skip if already exists
+                    if tif_name in existing_names:
+                        messages.append(f"      Skipped (exists): {tif_name}")
+                        total_skipped += 1
+                        continue
+
+                    # A TIFF this small can't hold a header plus data; reject it
+                    # from the cached scandir stat instead of paying a GDAL open
+                    if tif_entry.stat().st_size < 1024:
+                        messages.append(f"      FAILED (truncated file): {tif_name}")
+                        total_failed += 1
+                        continue
+
+                    pending.append((tif_entry, tif_name))
+
+                # Load and style rasters in parallel, in deterministic order
+                results = []
+                if pending:
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        results = list(executor.map(lambda item: load_raster(*item), pending))
+
+                new_layers = []
+                for tif_name, layer in results:
+                    if layer is None:
+                        messages.append(f"      FAILED: {tif_name}")
+                        total_failed += 1
+                        continue
+                    new_layers.append((tif_name, layer))
+
+                if new_layers:
+                    # Register with the project in one call per subfolder, then
+                    # hang all the tree nodes in a single insert; addLayer would
+                    # re-emit tree signals up the root once per layer
+                    project.addMapLayers([layer for _, layer in new_layers], False)
+                    nodes = [QgsLayerTreeLayer(layer) for _, layer in new_layers]
+                    group.insertChildNodes(-1, nodes)
+                    for tif_name, _ in new_layers:
+                        existing_names.add(tif_name)
+                        messages.append(f"      Added: {tif_name}")
+                        total_added += 1
+
+                if messages:
+                    sys.stdout.write("\n".join(messages) + "\n")
+
+        finally:
+            project.blockSignals(False)
+            root.blockSignals(False)
+
+        # Save project: write to a sibling temp file and swap it into place,
+        # so a crash mid-write can't leave a truncated wfma.qgs behind
         print("\n" + "=" * 60)
         print("Saving project...")
-        if project.write():
+        tmp_file = str(PROJECT_FILE) + ".tmp"
+        if project.write(tmp_file):
+            os.replace(tmp_file, str(PROJECT_FILE))
+            project.setFileName(str(PROJECT_FILE))
             print(f"Project saved: {PROJECT_FILE}")
         else:
             print("ERROR: Failed to save project!")
@@ -178,7 +255,7 @@ def setup_depths():
         return True
 
     finally:
-        qgs.exitQgis()
+        exit_qgis()
 
 
 if __name__ == "__main__":
@@ -10,8 +10,10 @@ Usage:
     python stawell.py
 """
 
+import os
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Paths
@@ -19,6 +21,23 @@ SOURCE_DIR = Path(r"C:\Users\m.rahman\qgis\wfm_stawell\stawell\data\rasters")
 DEST_DIR = Path(r"C:\Users\m.rahman\qgis\wfma\data\depth\Stawell_2024")
 
 
+def fast_copy(src, dst):
+    """Copy a file with timestamps using the platform fast path.
+
+    On Windows, CopyFileExW copies data and metadata in a single call and
+    lets SMB shares do a server-side copy. Elsewhere, shutil.copyfile takes
+    the kernel zero-copy path and copystat fills in the metadata.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        if not kernel32.CopyFileExW(str(src), str(dst), None, None, None, 0):
+            raise ctypes.WinError(ctypes.get_last_error())
+    else:
+        shutil.copyfile(src, dst)
+        shutil.copystat(src, dst)
+
+
 def main():
     print("=" * 60)
     print("Stawell Data Import")
@@ -35,35 +54,56 @@ def main():
     DEST_DIR.mkdir(parents=True, exist_ok=True)
     print(f"\nDestination folder ready.")
 
+    # Scan the destination once instead of a stat per source folder
+    with os.scandir(DEST_DIR) as it:
+        existing = {e.name for e in it}
+
     # Find all subfolders with data.tif
     copied = 0
     skipped = 0
     failed = 0
 
-    folders = sorted([d for d in SOURCE_DIR.iterdir() if d.is_dir()])
+    with os.scandir(SOURCE_DIR) as it:
+        folders = sorted([e for e in it if e.is_dir()], key=lambda e: e.name)
     print(f"Found {len(folders)} folders to process.\n")
 
+    pending = []
     for folder in folders:
         folder_name = folder.name
-        source_tif = folder / "data.tif"
-        dest_tif = DEST_DIR / f"{folder_name}.tif"
+        source_tif = os.path.join(folder.path, "data.tif")
 
-        if not source_tif.exists():
+        if not os.path.isfile(source_tif):
             print(f"  {folder_name}: No data.tif found, skipping")
             skipped += 1
             continue
 
-        if dest_tif.exists():
+        if f"{folder_name}.tif" in existing:
             print(f"  {folder_name}: Already exists, skipping")
             skipped += 1
             continue
 
+        pending.append((folder_name, source_tif, DEST_DIR / f"{folder_name}.tif"))
+
+    def copy_one(item):
+        folder_name, source_tif, dest_tif = item
         try:
-            shutil.copy2(source_tif, dest_tif)
+            fast_copy(source_tif, dest_tif)
+            return folder_name, None
+        except Exception as e:
+            return folder_name, e
+
+    # The copies are independent and I/O bound, so overlap them on threads
+    results = []
+    if pending:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(copy_one, pending))
+
+    for folder_name, error in results:
+        if error is None:
             print(f"  {folder_name}: Copied")
             copied += 1
-        except Exception as e:
-            print(f"  {folder_name}: FAILED - {e}")
+        else:
+            print(f"  {folder_name}: FAILED - {error}")
             failed += 1
 
     print(f"\n" + "=" * 60)